@@ -6,8 +6,10 @@ import hashlib
 import logging
 import os
 import csv
+import dataclasses
+import sys
 from datetime import datetime
-from rich.console import Console
+from rich.console import Console, Group
 from rich.table import Table
 from rich.panel import Panel
 from rich.align import Align
@@ -19,17 +21,96 @@ from attendanceRecord import AttendanceRecord
 from niaSignalRMonitor import NIASignalRMonitor
 from methods import handle_signalr_attendance_update, send_telegram_message
 
+try:
+    import orjson
+except ImportError:  # needs a Rust toolchain to build on Termux
+    orjson = None
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# Stored with the known record hashes; hashes made another way are not
+# comparable and are replaced by the next poll
+_HASH_ALGO = 'xxh3_128' if xxhash else 'blake2b_128'
+
+_TOKEN_RE = re.compile(r'name="__RequestVerificationToken".*?value="([^"]+)"')
+# Cookie names the SignalR connection token may arrive under, tried in order
+_SIGNALR_COOKIE_RES = (
+    re.compile(r'connectionToken=([^;]+)'),
+    re.compile(r'SignalR\.ConnectionToken=([^;]+)'),
+    re.compile(r'__SignalRToken=([^;]+)'),
+)
+_SIGNALR_URL_TOKEN_RE = re.compile(r'connectionToken=([^&]+)')
+
 console = Console()
 
 import os
 
+
+def _json_default(obj):
+    """Serialise the records and timestamps held in an analysis for json"""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if dataclasses.is_dataclass(obj):
+        return dataclasses.asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _read_key(timeout):
+    """Return one keypress, or '' if none arrives within timeout seconds"""
+    if os.name == 'nt':
+        import msvcrt
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if msvcrt.kbhit():
+                return msvcrt.getwch()
+            time.sleep(0.05)
+        return ''
+    
+    import select
+    import termios
+    import tty
+    fd = sys.stdin.fileno()
+    try:
+        saved = termios.tcgetattr(fd)
+    except termios.error:
+        # Not a terminal (piped input): take the first character of a line,
+        # and quit once the input is closed
+        ready, _, _ = select.select([sys.stdin], [], [], timeout)
+        if not ready:
+            return ''
+        return sys.stdin.readline()[:1] or 'q'
+    try:
+        tty.setcbreak(fd)
+        ready, _, _ = select.select([sys.stdin], [], [], timeout)
+        return sys.stdin.read(1) if ready else ''
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, saved)
+
+
+def load_attendance_backup(filename):
+    """Read every record from a JSON Lines backup written by save_attendance_record"""
+    with open(filename, 'rb') as f:
+        return [orjson.loads(line) if orjson else json.loads(line) for line in f if line.strip()]
+
 class NIAAttendanceMonitor:
+    # Column names and options of the today's-records table
+    _TODAY_COLUMNS = (
+        ("#", {"justify": "right", "style": "white", "width": 4}),
+        ("Time", {"style": "green", "width": 15}),
+        ("Temp", {"style": "yellow", "width": 6}),
+        ("Status", {"style": "magenta", "width": 8}),
+    )
+
     def __init__(self, config=None):
         self.config = config or Config().load()
         self.base_url = self.config['base_url']
         self.auth_url = self.config['auth_url']
         self.session = requests.Session()
         self.state_file = os.path.expanduser('~/.nia_monitor_state.json')
+        self.cookie_file = os.path.expanduser('~/.nia_monitor_cookies.json')
         
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
@@ -41,34 +122,55 @@ class NIAAttendanceMonitor:
     def _load_state(self):
         try:
             if os.path.exists(self.state_file):
-                with open(self.state_file, 'r') as f:
-                    self.state = json.load(f)
+                with open(self.state_file, 'rb') as f:
+                    raw = f.read()
+                self.state = orjson.loads(raw) if orjson else json.loads(raw)
                 console.print("│ [green]📁 STATE: Session data loaded[/green]")
             else:
                 self.state = {'last_check': None, 'known_records': []}
         except Exception as e:
             console.print(f"│ [red]⚠️  STATE LOAD ERROR: {e}[/red]")
             self.state = {'last_check': None, 'known_records': []}
+        # Membership is tested every poll, so keep the hashes as a set and
+        # only turn them back into a list when saving
+        if self.state.get('known_records') and self.state.get('hash_algo') != _HASH_ALGO:
+            self._known_set = None
+        else:
+            self._known_set = set(self.state.get('known_records', []))
+        self.state['hash_algo'] = _HASH_ALGO
     
     def _save_state(self):
         try:
-            with open(self.state_file, 'w') as f:
-                json.dump(self.state, f, indent=2)
+            self.state['known_records'] = list(self._known_set or ())
+            if orjson:
+                payload = orjson.dumps(self.state, option=orjson.OPT_INDENT_2)
+            else:
+                payload = json.dumps(self.state, indent=2).encode()
+            with open(self.state_file, 'wb') as f:
+                f.write(payload)
         except Exception as e:
             console.print(f"│ [red]⚠️  STATE SAVE ERROR: {e}[/red]")
     
     def _hash_record(self, record: AttendanceRecord) -> str:
         key_data = f"{record.employee_id}_{record.date_time.isoformat()}_{record.status}"
-        return hashlib.sha256(key_data.encode()).hexdigest()
+        # Local dedup key only, so a fast non-cryptographic digest is plenty
+        if xxhash:
+            return xxhash.xxh3_128_hexdigest(key_data.encode())
+        return hashlib.blake2b(key_data.encode(), digest_size=16).hexdigest()
     
     def detect_changes(self, current_records: List[AttendanceRecord]) -> Dict[str, Any]:
         current_hashes = [self._hash_record(record) for record in current_records]
-        previous_hashes = self.state.get('known_records', [])
+        previous_hashes = self._known_set
         
-        new_records = [r for r in current_records if self._hash_record(r) not in previous_hashes]
-        missing_records = [h for h in previous_hashes if h not in current_hashes]
+        if previous_hashes is None:
+            # Saved hashes used another algorithm: this poll is the baseline
+            new_records = []
+            missing_records = []
+        else:
+            new_records = [r for r, h in zip(current_records, current_hashes) if h not in previous_hashes]
+            missing_records = list(previous_hashes.difference(current_hashes))
         
-        self.state['known_records'] = current_hashes
+        self._known_set = set(current_hashes)
         self.state['last_check'] = datetime.now().isoformat()
         self._save_state()
         
@@ -82,14 +184,57 @@ class NIAAttendanceMonitor:
             'changes_detected': len(new_records) > 0 or len(missing_records) > 0
         }
 
-    def login(self, employee_id, password):
+    def _restore_session(self, employee_id):
+        """Reuse the cookies of an earlier login if the portal still accepts them"""
+        try:
+            with open(self.cookie_file, 'rb') as f:
+                raw = f.read()
+            saved = orjson.loads(raw) if orjson else json.loads(raw)
+        except (OSError, ValueError):
+            return False
+        if saved.get('employee_id') != employee_id:
+            return False
+        
+        for cookie in saved.get('cookies', []):
+            self.session.cookies.set(cookie['name'], cookie['value'], domain=cookie['domain'], path=cookie['path'])
+        try:
+            response = self.session.get(f"{self.base_url}/Attendance")
+            if response.ok and not response.url.startswith(self.auth_url):
+                return True
+        except requests.exceptions.RequestException:
+            pass
+        self.session.cookies.clear()
+        return False
+    
+    def _save_session(self, employee_id):
+        """Save the session cookies for the next run, readable by this user only"""
+        saved = {
+            'employee_id': employee_id,
+            'cookies': [
+                {'name': c.name, 'value': c.value, 'domain': c.domain, 'path': c.path}
+                for c in self.session.cookies
+            ]
+        }
+        try:
+            payload = orjson.dumps(saved) if orjson else json.dumps(saved).encode()
+            fd = os.open(self.cookie_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with open(fd, 'wb') as f:
+                f.write(payload)
+        except Exception as e:
+            console.print(f"│ [red]⚠️  SESSION SAVE ERROR: {e}[/red]")
+    
+    def login(self, employee_id, password, reuse_saved=True):
         """Login to the NIA system"""
         try:
+            if reuse_saved and self._restore_session(employee_id):
+                console.print("│ [green]✅ AUTH: Saved session still valid[/green]")
+                return True
+            
             console.print("│ [blue]🔐 AUTH: Accessing NIA portal...[/blue]")
             
             response = self.session.get(self.auth_url)
             
-            token_match = re.search(r'name="__RequestVerificationToken".*?value="([^"]+)"', response.text)
+            token_match = _TOKEN_RE.search(response.text)
             if not token_match:
                 console.print("│ [red]🚨 AUTH: Security token not found[/red]")
                 return False
@@ -109,6 +254,7 @@ class NIAAttendanceMonitor:
             
             if response.status_code == 200 and employee_id in response.text:
                 console.print("│ [green]✅ AUTH: Access granted[/green]")
+                self._save_session(employee_id)
                 return True
             else:
                 console.print("│ [red]🚨 AUTH: Access denied - invalid credentials[/red]")
@@ -213,27 +359,31 @@ class NIAAttendanceMonitor:
             return None
             
         try:
-            filename = f"attendance_{datetime.now().strftime('%Y%m%d_%H%M')}.csv"
+            now = datetime.now()
+            filename = f"attendance_{now.strftime('%Y%m%d_%H%M')}.csv"
 
-            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                csvfile.write("# NIA Attendance Export (API)\n")
-                csvfile.write(f"# Generated: {datetime.now().isoformat()}\n")
-                csvfile.write(f"# Employee: {employee_id}\n")
-                csvfile.write(f"# Records: {len(records)}\n")
-                csvfile.write(f"# New Records: {len(changes['new_records'])}\n#\n")
+            with open(filename, 'w', newline='', encoding='utf-8', buffering=65536) as csvfile:
+                csvfile.write(
+                    "# NIA Attendance Export (API)\n"
+                    f"# Generated: {now.isoformat()}\n"
+                    f"# Employee: {employee_id}\n"
+                    f"# Records: {len(records)}\n"
+                    f"# New Records: {len(changes['new_records'])}\n#\n"
+                )
                 
                 writer = csv.writer(csvfile)
                 writer.writerow(['Date Time', 'Temperature', 'Employee ID', 'Employee Name', 'Machine Name', 'Status'])
-                
-                for record in records:
-                    writer.writerow([
+                writer.writerows(
+                    (
                         record.date_time.strftime('%Y-%m-%d %H:%M:%S'),
                         record.temperature or '',
                         record.employee_id,
                         record.employee_name,
                         record.machine_name,
                         record.status
-                    ])
+                    )
+                    for record in records
+                )
 
             console.print(f"│ [green]💾 EXPORT: Data saved to {filename}[/green]")
             return filename
@@ -299,14 +449,8 @@ class NIAAttendanceMonitor:
             if 'Set-Cookie' in response.headers:
                 set_cookie = response.headers['Set-Cookie']
                 
-                token_patterns = [
-                    r'connectionToken=([^;]+)',
-                    r'SignalR\.ConnectionToken=([^;]+)',
-                    r'__SignalRToken=([^;]+)',
-                ]
-                
-                for pattern in token_patterns:
-                    match = re.search(pattern, set_cookie)
+                for pattern in _SIGNALR_COOKIE_RES:
+                    match = pattern.search(set_cookie)
                     if match:
                         token = match.group(1)
                         console.print("│ [green]✅ TOKEN: Acquired from headers[/green]")
@@ -348,7 +492,7 @@ class NIAAttendanceMonitor:
                     return token
                 elif 'Url' in negotiation_data:
                     url = negotiation_data['Url']
-                    token_match = re.search(r'connectionToken=([^&]+)', url)
+                    token_match = _SIGNALR_URL_TOKEN_RE.search(url)
                     if token_match:
                         token = token_match.group(1)
                         console.print("│ [green]✅ TOKEN: Extracted from URL[/green]")
@@ -362,6 +506,23 @@ class NIAAttendanceMonitor:
             console.print(f"│ [red]🚨 NEGOTIATION ERROR: {e}[/red]")
             return None
 
+    def create_today_table(self, records):
+        """Create the table of today's records shown by checks and the interactive monitor"""
+        table = Table(show_header=True, header_style="bold cyan", width=60)
+        for name, column in self._TODAY_COLUMNS:
+            table.add_column(name, **column)
+        
+        for idx, record in enumerate(records, start=1):
+            table.add_row(
+                str(idx),
+                record.date_time.strftime("%H:%M:%S"),
+                f"{record.temperature:.1f}" if record.temperature else "N/A",
+                record.status,
+                style="red" if record.status == "ACCESS_DENIED" else None
+            )
+        
+        return table
+
     def _create_hacker_table(self, records, title="BIOMETRIC DATA"):
         """Create a compact hacker-style table"""
         if not records:
@@ -999,45 +1160,42 @@ class NIAAttendanceMonitor:
         check_count = 0
         
         while True:
-            console.clear()
-            console.print(Align.center(f"🔍 INTERACTIVE MONITOR - CHECK #{check_count + 1}"))
-            console.print("─" * 59)
+            title = f"🔍 INTERACTIVE MONITOR - CHECK #{check_count + 1}"
             
+            # The previous screen stays up while fetching; the fetch and
+            # analysis messages are kept for the new one
             console.print("│ [yellow]🔄 Fetching attendance data...[/yellow]")
+            with console.capture() as capture:
+                attendance_data = self.get_attendance_data(employee_id)
+                analysis = None
+                if attendance_data:
+                    check_count += 1
+                    analysis = self.analyze_attendance_patterns(attendance_data, employee_id)
             
-            attendance_data = self.get_attendance_data(employee_id)
-            
-            if attendance_data:
-                check_count += 1
-                analysis = self.analyze_attendance_patterns(attendance_data, employee_id)
-                
-                if analysis and analysis.get('today_details'):
-                    table = Table(show_header=True, header_style="bold cyan", width=60)
-                    table.add_column("#", justify="right", style="white", width=4)
-                    table.add_column("Time", style="green", width=15)
-                    table.add_column("Temp", style="yellow", width=6)
-                    table.add_column("Status", style="magenta", width=8)
-                    
-                    for idx, record in enumerate(analysis['today_details'], start=1):
-                        time_str = record.date_time.strftime("%H:%M:%S")
-                        temp_str = f"{record.temperature:.1f}" if record.temperature else "N/A"
-                        status = record.status
-                        
-                        row_style = "red" if status == "ACCESS_DENIED" else None
-                        table.add_row(str(idx), time_str, temp_str, status, style=row_style)
-                    
-                    console.print(table)
-                    console.print(f"│ [green]✅ {len(analysis['today_details'])} records today[/green]")
-                else:
-                    console.print("│ [yellow]📭 No records for today[/yellow]")
+            screen = [Align.center(title), "─" * 59]
+            messages = capture.get().rstrip("\n")
+            if messages:
+                screen.append(Text.from_ansi(messages))
+            if not attendance_data:
+                screen.append("│ [red]❌ Failed to fetch data[/red]")
+            elif analysis and analysis.get('today_details'):
+                screen.append(self.create_today_table(analysis['today_details']))
+                screen.append(f"│ [green]✅ {len(analysis['today_details'])} records today[/green]")
             else:
-                console.print("│ [red]❌ Failed to fetch data[/red]")
+                screen.append("│ [yellow]📭 No records for today[/yellow]")
+            screen.append(f"│ [dim]🕒 Check #{check_count} at {datetime.now().strftime('%H:%M:%S')}[/dim]")
+            screen.append(f"│ [bold]R[/bold]efresh [bold]S[/bold]ave [bold]Q[/bold]uit [dim](auto-refresh in {interval_seconds}s)[/dim]")
             
-            console.print(f"│ [dim]🕒 Check #{check_count} at {datetime.now().strftime('%H:%M:%S')}[/dim]")
-            console.print("│ [bold]R[/bold]efresh [bold]S[/bold]ave [bold]Q[/bold]uit")
+            # Swap screens in one write rather than leaving it blank during
+            # the fetch
+            console.clear()
+            console.print(Group(*screen))
             
             try:
-                key = console.input("\n│ Command: ").lower().strip()
+                # No key before the interval is up refreshes, like R
+                console.print("\n│ Command: ", end="")
+                key = _read_key(interval_seconds).lower().strip()
+                console.print(key)
                 
                 if key == 'q':
                     break
@@ -1050,7 +1208,7 @@ class NIAAttendanceMonitor:
                     else:
                         console.print("│ [yellow]⚠️  CSV export disabled[/yellow]")
                         console.input("│ Press Enter to continue...")
-                elif key == 'r':
+                elif key in ('r', ''):
                     continue
                 else:
                     console.print("│ [yellow]⚠️  Use R, S, or Q[/yellow]")
@@ -1118,20 +1276,18 @@ class NIAAttendanceMonitor:
             logging.info("Stopped by user")
     
     def save_attendance_record(self, attendance_data):
-        """Save attendance data to JSON backup"""
+        """Append attendance data to the monthly JSON Lines backup"""
         try:
-            filename = f"nia_attendance_backup_{datetime.now().strftime('%Y%m')}.json"
+            filename = f"nia_attendance_backup_{datetime.now().strftime('%Y%m')}.jsonl"
             
-            if os.path.exists(filename):
-                with open(filename, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+            # Encoded before the file is opened, so a record that cannot be
+            # serialised never leaves a partial line behind
+            if orjson:
+                line = orjson.dumps(attendance_data) + b'\n'
             else:
-                data = []
-            
-            data.append(attendance_data)
-            
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+                line = (json.dumps(attendance_data, ensure_ascii=False, default=_json_default) + '\n').encode()
+            with open(filename, 'ab') as f:
+                f.write(line)
             
             console.print(f"│ [green]✅ Saved to {filename}[/green]")
             
@@ -1155,7 +1311,7 @@ class NIAAttendanceMonitor:
         
         # Perform fresh login
         console.print("│ [blue]🔐 RE-AUTH: Performing fresh login...[/blue]")
-        if not self.login(employee_id, password):
+        if not self.login(employee_id, password, reuse_saved=False):
             console.print("│ [red]🚨 RE-AUTH: Login failed![/red]")
             return False
         
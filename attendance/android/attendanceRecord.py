@@ -3,6 +3,9 @@ from datetime import datetime
 from typing import Optional, Dict, Any
 from dataclasses import dataclass
 
+# .NET JSON dates, e.g. "/Date(1763355549000)/"
+_NET_DATE_RE = re.compile(r'\/Date\((\d+)\)\/')
+
 
 @dataclass
 class AttendanceRecord:
@@ -34,7 +37,7 @@ class AttendanceRecord:
     @staticmethod
     def parse_net_date(net_date_string):
         """Convert .NET Date format to Python datetime"""
-        match = re.search(r'\/Date\((\d+)\)\/', net_date_string)
+        match = _NET_DATE_RE.search(net_date_string)
         if match:
             timestamp = int(match.group(1))
             return datetime.fromtimestamp(timestamp / 1000)
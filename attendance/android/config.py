@@ -1,4 +1,3 @@
-import yaml
 import os, logging
 
 class Config:
@@ -17,6 +16,8 @@ class Config:
     
     def load(self):
         if os.path.exists(self.config_path):
+            # yaml is only needed once a config has been saved
+            import yaml
             try:
                 with open(self.config_path, 'r') as f:
                     user_config = yaml.safe_load(f) or {}
@@ -26,6 +27,7 @@ class Config:
         return self.defaults.copy()
     
     def save(self, config_data):
+        import yaml
         try:
             os.makedirs(os.path.dirname(self.config_path), exist_ok=True)
             with open(self.config_path, 'w') as f:
@@ -1,48 +1,48 @@
 import logging
-from rich.logging import RichHandler
-from rich.console import Console
-from rich.align import Align
-from rich.table import Table
-from methods import handle_signalr_attendance_update
 from config import Config
 import argparse
 import json
-from rich.prompt import Prompt
-from NIAAttendanceMonitor import NIAAttendanceMonitor
 import os
 import getpass
-from soundNotifier import SoundNotifier
-from methods import send_telegram_message
 
-console = Console()
-sound_notifier = SoundNotifier()
+# Rich, the notifiers and requests are only loaded once a monitor mode runs,
+# so --config-show/--config-set start quickly
+console = None
+sound_notifier = None
 
-# Set up logging with Rich handler for mobile-friendly output
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(message)s",
-    datefmt="%H:%M:%S",
-    handlers=[RichHandler(console=console, rich_tracebacks=True, markup=True, show_path=False)]
-)
+def _start_ui():
+    """Create the console and sound notifier and route logging through Rich"""
+    global console, sound_notifier
+    from rich.console import Console
+    from rich.logging import RichHandler
+    from soundNotifier import SoundNotifier
 
-def main():
-    # Show startup banner
-    console.print("\n")
-    console.print(Align.center("┌─────────────────────────────────────────────────────┐"))
-    console.print(Align.center("│              NIA ATTENDANCE MONITOR v3.0            │"))
-    console.print(Align.center("│               [red]SECURE BIOMETRIC SURVEILLANCE[/red]            │"))
-    console.print(Align.center("└─────────────────────────────────────────────────────┘"))
-    console.print()
-    send_telegram_message(message="NIA Attendance Booted")
+    console = Console()
+    sound_notifier = SoundNotifier()
 
-    # Initialize sound system
-    global sound_notifier
-    sound_notifier.initialize()
-    
-    # Play startup sound
-    sound_notifier.play_sound("startup")
-    
-    config = Config().load()
+    # Set up logging with Rich handler for mobile-friendly output; forced,
+    # since a config load warning may already have installed a plain handler
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(message)s",
+        datefmt="%H:%M:%S",
+        handlers=[RichHandler(console=console, rich_tracebacks=True, markup=True, show_path=False)],
+        force=True
+    )
+
+def _coerce_config_value(value):
+    """Turn a --config-set value into a bool or int where it looks like one"""
+    lowered = value.lower()
+    if lowered in ('true', 'false'):
+        return lowered == 'true'
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+def main():
+    config_obj = Config()
+    config = config_obj.load()
     
     parser = argparse.ArgumentParser(
         description="NIA Attendance Monitor - Live Display Version",
@@ -97,26 +97,45 @@ def main():
     
     args = parser.parse_args()
 
+    if args.config_set:
+        # Saved before --enable-csv is applied, so that flag stays per run
+        for key, value in args.config_set:
+            config[key] = _coerce_config_value(value)
+        config_obj.save(config)
+        print("│ ✅ Config updated")
+        return
+
     if args.enable_csv:
         config['enable_csv'] = True
 
     if args.config_show:
-        console.print("Configuration:")
-        console.print_json(json.dumps(config, indent=2))
+        print("Configuration:")
+        print(json.dumps(config, indent=2))
         return
+
+    _start_ui()
+    from rich.align import Align
+    from rich.console import Group
+    from rich.prompt import Prompt
+    from methods import handle_signalr_attendance_update, send_telegram_message
+    from NIAAttendanceMonitor import NIAAttendanceMonitor
+
+    # Show startup banner, rendered and written in one go
+    console.print(Group(
+        "\n",
+        Align.center("┌─────────────────────────────────────────────────────┐"),
+        Align.center("│              NIA ATTENDANCE MONITOR v3.0            │"),
+        Align.center("│               [red]SECURE BIOMETRIC SURVEILLANCE[/red]            │"),
+        Align.center("└─────────────────────────────────────────────────────┘"),
+        ""
+    ))
+    send_telegram_message(message="NIA Attendance Booted")
+
+    # Initialize sound system
+    sound_notifier.initialize()
     
-    if args.config_set:
-        config_obj = Config()
-        current_config = config_obj.load()
-        for key, value in args.config_set:
-            if value.isdigit():
-                value = int(value)
-            elif value.lower() in ('true', 'false'):
-                value = value.lower() == 'true'
-            current_config[key] = value
-        config_obj.save(current_config)
-        console.print("│ [green]✅ Config updated[/green]")
-        return
+    # Play startup sound
+    sound_notifier.play_sound("startup")
 
     monitor = NIAAttendanceMonitor(config=config)
     
@@ -145,13 +164,15 @@ def main():
         }
         choice = mode_map.get(args.mode, '1')
     else:
-        console.print("\n[bold bright_white]OPERATION MODES:[/bold bright_white]")
-        console.print("[bright_cyan]1.[/bright_cyan] 🔍 Quick System Scan")
-        console.print("[bright_cyan]2.[/bright_cyan] 📡 Real-time Surveillance") 
-        console.print("[bright_cyan]3.[/bright_cyan] 🚀 Live Dashboard (Recommended)")
-        console.print("[bright_cyan]4.[/bright_cyan] 🌐 Animated Live Display")
-        console.print("[bright_cyan]5.[/bright_cyan] 📡 Live Event Stream")
-        console.print("[bright_cyan]6.[/bright_cyan] ⚙️  System Configuration")
+        console.print(Group(
+            "\n[bold bright_white]OPERATION MODES:[/bold bright_white]",
+            "[bright_cyan]1.[/bright_cyan] 🔍 Quick System Scan",
+            "[bright_cyan]2.[/bright_cyan] 📡 Real-time Surveillance",
+            "[bright_cyan]3.[/bright_cyan] 🚀 Live Dashboard (Recommended)",
+            "[bright_cyan]4.[/bright_cyan] 🌐 Animated Live Display",
+            "[bright_cyan]5.[/bright_cyan] 📡 Live Event Stream",
+            "[bright_cyan]6.[/bright_cyan] ⚙️  System Configuration"
+        ))
         
         choice = Prompt.ask(
             "\n[bright_white]SELECT OPERATION[/bright_white]", 
@@ -172,30 +193,18 @@ def main():
             
             today_details = analysis.get('today_details', [])
             if today_details:
-                table = Table(show_header=True, header_style="bold cyan", width=60)
-                table.add_column("#", justify="right", width=4)
-                table.add_column("Time", style="green", width=15)
-                table.add_column("Temp", style="yellow", width=6)
-                table.add_column("Status", style="magenta", width=8)
-                
-                for idx, record in enumerate(today_details, start=1):
-                    time_str = record.date_time.strftime("%H:%M:%S")
-                    temp_str = f"{record.temperature:.1f}" if record.temperature else "N/A"
-                    status = record.status
-                    
-                    row_style = "red" if status == "ACCESS_DENIED" else None
-                    table.add_row(str(idx), time_str, temp_str, status, style=row_style)
-                
-                console.print(table)
+                console.print(monitor.create_today_table(today_details))
         else:
             console.print("│ [red]❌ Check failed![/red]")
     
     elif choice == "2":
         if args.interactive:
-            console.print("\n[bold]Real-Time Monitoring Mode:[/bold]")
-            console.print("1. 📡 SignalR WebSocket (True Real-Time)")
-            console.print("2. 🔄 Smart Polling (10s intervals)") 
-            console.print("3. ⏰ Standard Interactive (Manual refresh)")
+            console.print(Group(
+                "\n[bold]Real-Time Monitoring Mode:[/bold]",
+                "1. 📡 SignalR WebSocket (True Real-Time)",
+                "2. 🔄 Smart Polling (10s intervals)",
+                "3. ⏰ Standard Interactive (Manual refresh)"
+            ))
             
             realtime_choice = Prompt.ask("Choose real-time mode", choices=["1", "2", "3"], default="1")
             
@@ -219,7 +228,7 @@ def main():
     
     elif choice == "6":
         console.print("│ Configuration:")
-        console.print_json(json.dumps(config, indent=2))
+        console.print_json(data=config)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -18,6 +18,11 @@ from urllib.parse import quote
 from rich.console import Console
 from soundNotifier import SoundNotifier
 
+try:
+    import orjson
+except ImportError:  # needs a Rust toolchain to build on Termux
+    orjson = None
+
 console = Console()
 sound_notifier = SoundNotifier()
 
@@ -55,7 +60,7 @@ class NIASignalRMonitor:
         """Fixed message handling for actual NIA SignalR format"""
         try:
             self.last_message_time = time.time()
-            data = json.loads(message)
+            data = orjson.loads(message) if orjson else json.loads(message)
             
             # Show raw message for debugging
             # console.print(f"│ [dim]📨 SIGNALR: {json.dumps(data)[:150]}...[/dim]")
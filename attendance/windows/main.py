@@ -1,23 +1,19 @@
 import argparse
-import hashlib
-import json
+import atexit
+import csv
 import logging
 import os
 import re
+import signal
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
-import getpass
-import pandas as pd
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.common.exceptions import TimeoutException, WebDriverException
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
-from webdriver_manager.chrome import ChromeDriverManager
+from lxml import etree
+from lxml import html as lxml_html
+import requests
+from requests.adapters import HTTPAdapter
 
 # Set up logging
 logging.basicConfig(
@@ -26,14 +22,132 @@ logging.basicConfig(
     datefmt='%Y-%m-%d %H:%M:%S'
 )
 
+# Attendance table lookups, compiled once at import. Page source is always
+# UTF-8, so the parser never has to guess the encoding.
+_HTML_PARSER = lxml_html.HTMLParser(encoding='utf-8')
+_TABLE_XP = etree.XPath("//table[@id='DataTables_Table_0']")
+_HEADERS_XP = etree.XPath("./thead/tr[1]/th")
+_ROWS_XP = etree.XPath("./tbody/tr | ./tr")
+_TFOOT_CELLS_XP = etree.XPath("./tfoot//th")
+_CAPTION_XP = etree.XPath("./caption")
+
+# Browser-side snippets for the attendance page
+# The JSON DataTables last received for the table when it has one,
+# otherwise the table markup
+_TABLE_CONTENT_JS = """
+var t = document.getElementById('DataTables_Table_0');
+if (!t) { return ''; }
+try {
+    if (window.jQuery && jQuery.fn.dataTable.isDataTable(t)) {
+        var j = jQuery(t).DataTable().ajax.json();
+        if (j && Array.isArray(j.data) && (j.data.length === 0 || 'DateTimeStamp' in j.data[0])) {
+            return j;
+        }
+    }
+} catch (e) {}
+return t.outerHTML;
+"""
+# The same, but null until rows are shown and jQuery's Ajax has settled,
+# so one script call per poll both waits and reads
+_READY_TABLE_CONTENT_JS = """
+var ready = document.querySelector('#DataTables_Table_0 tbody tr') !== null
+    && (typeof jQuery === 'undefined' || jQuery.active === 0);
+if (!ready) { return null; }
+""" + _TABLE_CONTENT_JS
+# Login form fields and submit button in one round trip, null until both
+# fields are present
+_LOGIN_FORM_JS = """
+var f = document.getElementsByName('EmployeeID')[0],
+    p = document.getElementsByName('Password')[0];
+if (!f || !p) { return null; }
+return [f, p, document.querySelector("button[type='submit']")];
+"""
+_AJAX_RELOAD_JS = """
+try {
+    var t = window.jQuery && jQuery('#DataTables_Table_0');
+    if (!t || !jQuery.fn.dataTable.isDataTable(t) || !t.DataTable().ajax.url()) { return false; }
+    // Report a failed reload (e.g. expired session) silently instead of via alert()
+    jQuery.fn.dataTable.ext.errMode = 'none';
+    window.__niaReloaded = false;
+    t.DataTable().ajax.reload(function () { window.__niaReloaded = true; }, false);
+    return true;
+} catch (e) {
+    return false;
+}
+"""
+
+_CAPTION_COUNT_RE = re.compile(r'\((\d+)\)')
+# Date Time column formats, e.g. "11/17/2025 12:59:09 PM"
+_DATE_FMT_FULL = '%m/%d/%Y %I:%M:%S %p'
+
+# The DataTable's own Ajax source and the columns it asks for, in table order
+_TOKEN_RE = re.compile(r'name="__RequestVerificationToken".*?value="([^"]+)"')
+_NET_DATE_RE = re.compile(r'/Date\((\d+)\)/')
+_API_COLUMNS = ('Id', 'DateTimeStamp', 'Temperature', 'Name', 'EmployeeID', 'MachineName')
+_API_HEADERS = ['ID', 'Date Time', 'Temperature', 'Name', 'Employee ID', 'Machine Name']
+# Subresources the scrape never needs; refused before they hit the network
+_BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.ico",
+    "*.css", "*.woff", "*.woff2", "*.ttf",
+    "*google-analytics*", "*googletagmanager*"
+]
+_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36"
+)
+
+
+def _squash_ws(value):
+    """Collapse runs of whitespace, returning already-clean strings untouched"""
+    if '  ' not in value and '\t' not in value and '\n' not in value:
+        return value
+    return ' '.join(value.split())
+
+
 class NIAAttendanceMonitor:
-    def __init__(self, headless=True, driver_path=None):
+    # ChromeDriver resolved by webdriver_manager, shared by every instance
+    _cached_driver_path = None
+
+    def __init__(self, headless=True, driver_path=None, use_http=True, low_memory=False, profile_dir=None):
         self.base_url = "https://attendance.caraga.nia.gov.ph"
         self.auth_url = "https://accounts.nia.gov.ph/Account/Login"
         self.headless = headless
         self.driver_path = driver_path
+        self.low_memory = low_memory
+        # Persistent Chrome profile: a new browser starts with the last
+        # run's portal cookies and can skip the login form
+        self.profile_dir = os.path.expanduser(profile_dir) if profile_dir else None
+        # Fetch through the portal's JSON endpoint first; the browser is
+        # only started when that fails
+        self.use_http = use_http
+        # One keep-alive HTTP session per employee so logins never mix
+        self._sessions = {}
+        # Shared by those sessions, so parallel checks reuse the same warm
+        # TLS connections per host instead of each opening its own
+        self._http_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        atexit.register(self.close)
+        # Daily CSV export and the rows already written to it
+        self._csv_day_file = None
+        self._csv_written = set()
+        # (employee_id, fetched table content key, parsed result) of the last
+        # monitor poll, so an unchanged table is not parsed again
+        self._last_fetch = None
+        # Serialises backup appends when several checks run in parallel
+        self._backup_lock = threading.Lock()
+        # Set to end monitor_attendance's wait between checks early
+        self._stop = threading.Event()
+        # Append handle of this month's JSON Lines backup, kept open between
+        # saves and swapped when the month changes
+        self._backup_file = None
+        self._backup_month = None
     
     def _create_driver(self):
+        # Selenium is only needed when the HTTP fetch falls back to a browser
+        from selenium import webdriver
+        from selenium.common.exceptions import WebDriverException
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+
         options = Options()
         if self.headless:
             options.add_argument("--headless=new")
@@ -42,18 +156,282 @@ class NIAAttendanceMonitor:
         options.add_argument("--disable-dev-shm-usage")
         options.add_argument("--window-size=1920,1080")
         options.add_argument("--log-level=3")
-        service = Service(self.driver_path or ChromeDriverManager().install())
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_argument("--disable-background-networking")
+        options.add_argument("--disable-sync")
+        options.add_argument("--disable-default-apps")
+        options.add_argument("--disable-background-timer-throttling")
+        options.add_argument("--disable-renderer-backgrounding")
+        # Startup and background services a scraping session never uses
+        options.add_argument("--no-first-run")
+        options.add_argument("--disable-extensions")
+        options.add_argument("--disable-component-update")
+        options.add_argument("--disable-client-side-phishing-detection")
+        options.add_argument("--disable-breakpad")
+        options.add_argument("--mute-audio")
+        options.add_argument("--autoplay-policy=user-gesture-required")
+        if self.low_memory:
+            # One browser process and no per-site renderers, for small
+            # hosts; less stable than Chrome's default process model
+            options.add_argument("--single-process")
+            options.add_argument("--no-zygote")
+            options.add_argument("--renderer-process-limit=1")
+            options.add_argument("--disk-cache-size=1")
+            options.add_argument("--disable-features=TranslateUI,site-per-process,IsolateOrigins")
+        else:
+            options.add_argument("--disable-features=TranslateUI")
+        # Only the table markup is scraped: skip images, stylesheets and
+        # fonts, and return from driver.get() at DOMContentLoaded; explicit
+        # waits cover the rest
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.stylesheets": 2,
+            "profile.managed_default_content_settings.fonts": 2,
+            "profile.default_content_setting_values.notifications": 2,
+            "safebrowsing.enabled": False,
+            "net.network_prediction_options": 2
+        })
+        options.page_load_strategy = 'eager'
+        if self.profile_dir:
+            options.add_argument(f"--user-data-dir={self.profile_dir}")
+        service = Service(self.driver_path or self._resolve_driver_path())
         driver = webdriver.Chrome(service=service, options=options)
-        driver.set_page_load_timeout(60)
+        driver.set_page_load_timeout(30)
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": _BLOCKED_URLS})
+        except WebDriverException as e:
+            logging.debug(f"Could not set blocked URLs: {e}")
         return driver
 
+    @classmethod
+    def _resolve_driver_path(cls):
+        """Return the webdriver_manager ChromeDriver path, looking it up only once"""
+        if cls._cached_driver_path is None:
+            from webdriver_manager.chrome import ChromeDriverManager
+
+            cls._cached_driver_path = ChromeDriverManager().install()
+        return cls._cached_driver_path
+
+    def close(self):
+        """Close the kept HTTP sessions, their pooled connections and the backup file"""
+        for session in self._sessions.values():
+            session.close()
+        self._sessions.clear()
+        with self._backup_lock:
+            if self._backup_file:
+                self._backup_file.close()
+                self._backup_file = None
+                self._backup_month = None
+
+    def _http_session(self, employee_id):
+        """Return the keep-alive requests session for this employee"""
+        session = self._sessions.get(employee_id)
+        if session is None:
+            session = requests.Session()
+            session.mount('https://', self._http_adapter)
+            session.headers.update({'User-Agent': _USER_AGENT})
+            self._load_cookies(session, employee_id)
+            self._sessions[employee_id] = session
+        return session
+
+    @staticmethod
+    def _cookie_file(employee_id):
+        safe_id = re.sub(r'\W', '_', employee_id)
+        return os.path.expanduser(f"~/.nia_session_{safe_id}.json")
+
+    def _load_cookies(self, session, employee_id):
+        """Restore cookies saved by an earlier run so it can skip the login"""
+        import orjson
+
+        try:
+            with open(self._cookie_file(employee_id), 'rb') as f:
+                cookies = orjson.loads(f.read())
+        except FileNotFoundError:
+            return
+        except (OSError, orjson.JSONDecodeError) as e:
+            logging.debug(f"Ignoring saved session cookies: {e}")
+            return
+        for cookie in cookies:
+            session.cookies.set(cookie['name'], cookie['value'], domain=cookie['domain'], path=cookie['path'])
+
+    def _save_cookies(self, session, employee_id):
+        """Persist the session cookies, readable by the current user only"""
+        import orjson
+
+        cookies = [
+            {'name': c.name, 'value': c.value, 'domain': c.domain, 'path': c.path}
+            for c in session.cookies
+        ]
+        try:
+            fd = os.open(self._cookie_file(employee_id), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with open(fd, 'wb') as f:
+                f.write(orjson.dumps(cookies))
+        except OSError as e:
+            logging.debug(f"Could not save session cookies: {e}")
+
+    def _login_http(self, session, employee_id, password):
+        """Log in with a plain form POST, returning True on success"""
+        login_url = f"{self.auth_url}?ReturnUrl={self.base_url}/"
+        response = session.get(login_url, timeout=30)
+        response.raise_for_status()
+        token_match = _TOKEN_RE.search(response.text)
+        if not token_match:
+            logging.debug("Login form has no anti-forgery token")
+            return False
+
+        login_data = {
+            'EmployeeId': employee_id,
+            'Password': password,
+            'RememberMe': 'false',
+            '__RequestVerificationToken': token_match.group(1)
+        }
+        response = session.post(login_url, data=login_data, timeout=30)
+        response.raise_for_status()
+        # Only a redirect back to the attendance host means the portal took
+        # the credentials; a rejected login re-renders the form on the
+        # accounts host, often with the submitted ID still filled in
+        if response.url.startswith(self.base_url):
+            logging.info("✓ Login successful via HTTP")
+            self._save_cookies(session, employee_id)
+            return True
+        return False
+
+    def _fetch_attendance_json(self, session, employee_id, length=100):
+        """POST to the DataTable's IndexData endpoint; None when logged out"""
+        now = datetime.now()
+        url = f"{self.base_url}/Attendance/IndexData/{now.year}?month={now.strftime('%B')}&eid={employee_id}"
+        form = {
+            'draw': '1',
+            'order[0][column]': '1',
+            'order[0][dir]': 'desc',
+            'start': '0',
+            'length': str(length),
+            'search[value]': '',
+            'search[regex]': 'false'
+        }
+        for i, name in enumerate(_API_COLUMNS):
+            form[f'columns[{i}][data]'] = name
+            form[f'columns[{i}][searchable]'] = 'true'
+            form[f'columns[{i}][orderable]'] = 'true'
+
+        response = session.post(
+            url,
+            data=form,
+            headers={'Referer': f'{self.base_url}/Attendance', 'X-Requested-With': 'XMLHttpRequest'},
+            timeout=30
+        )
+        response.raise_for_status()
+        # An expired session is answered with the HTML login page
+        if 'json' not in response.headers.get('Content-Type', ''):
+            return None
+        return response.json()
+
+    @staticmethod
+    def _api_to_rows(api_data):
+        """Convert IndexData JSON into rows shaped like the rendered table"""
+        rows = []
+        for record in api_data.get('data', []):
+            row = []
+            for name in _API_COLUMNS:
+                value = record.get(name)
+                if name == 'DateTimeStamp' and value:
+                    match = _NET_DATE_RE.search(value)
+                    if match:
+                        value = datetime.fromtimestamp(int(match.group(1)) / 1000).strftime(_DATE_FMT_FULL)
+                row.append('' if value is None else str(value))
+            rows.append(row)
+        return rows
+
+    def _get_attendance_data_http(self, employee_id, password, save_csv, allow_login=True):
+        """Fetch attendance without a browser; returns None to fall back to Selenium
+
+        With ``allow_login=False`` only the session's current cookies are
+        tried, for when a logged-in browser is already there to fall back on.
+        """
+        session = self._http_session(employee_id)
+        try:
+            # A kept or restored session skips the login until the portal
+            # drops it; any failure with old cookies just means logging in
+            api_data = None
+            if session.cookies:
+                try:
+                    api_data = self._fetch_attendance_json(session, employee_id)
+                except (requests.RequestException, ValueError):
+                    api_data = None
+            if api_data is None:
+                if not allow_login:
+                    return None
+                if not self._login_http(session, employee_id, password):
+                    logging.warning("HTTP login failed, falling back to the browser")
+                    return None
+                api_data = self._fetch_attendance_json(session, employee_id)
+            if api_data is None:
+                logging.warning("Attendance endpoint did not return JSON, falling back to the browser")
+                return None
+        except (requests.RequestException, ValueError) as e:
+            logging.warning(f"HTTP fetch failed ({e}), falling back to the browser")
+            return None
+        return self._attendance_from_api(employee_id, api_data, save_csv)
+
+    def _parse_unless_unchanged(self, employee_id, content, parse):
+        """Return the last poll's result when the fetched table is identical"""
+        if isinstance(content, dict):
+            # DataTables bumps the JSON's 'draw' counter on every reload, so
+            # only the rows and the total say whether the table changed
+            content = (content.get('recordsTotal'), content.get('data'))
+        last = self._last_fetch
+        if last is not None and last[0] == employee_id and last[1] == content:
+            logging.debug("Attendance table unchanged, skipping parse")
+            return last[2]
+        attendance_data = parse()
+        self._last_fetch = (employee_id, content, attendance_data)
+        return attendance_data
+
+    def _adopt_browser_cookies(self, driver, employee_id):
+        """Copy the browser's portal cookies into the HTTP session"""
+        session = self._http_session(employee_id)
+        for cookie in driver.get_cookies():
+            session.cookies.set(
+                cookie['name'],
+                cookie['value'],
+                domain=cookie.get('domain', ''),
+                path=cookie.get('path', '/')
+            )
+        self._save_cookies(session, employee_id)
+
+    def _attendance_from_api(self, employee_id, api_data, save_csv):
+        """Build the attendance result from IndexData JSON"""
+        if not save_csv:
+            return self._parse_unless_unchanged(employee_id, api_data, lambda: self._api_attendance(api_data))
+        attendance_data = self._api_attendance(api_data)
+        self._write_export_csv(employee_id, attendance_data['records'])
+        return attendance_data
+
+    def _api_attendance(self, api_data):
+        rows = self._api_to_rows(api_data)
+        now = datetime.now()
+        return {
+            'timestamp': now.isoformat(),
+            'date': now.strftime('%Y-%m-%d'),
+            'table_headers': list(_API_HEADERS),
+            'records': rows,
+            'records_found': len(rows),
+            'total_records_caption': str(api_data.get('recordsTotal', 'Unknown')),
+            'report_generated_time': now.strftime(_DATE_FMT_FULL)
+        }
+
     def _login_with_selenium(self, driver, employee_id, password):
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
         logging.debug("Opening login page with Selenium...")
         driver.get(f"{self.auth_url}?ReturnUrl={self.base_url}/")
-        wait = WebDriverWait(driver, 30)
+        wait = WebDriverWait(driver, 30, poll_frequency=0.2)
 
-        employee_input = wait.until(EC.presence_of_element_located((By.NAME, "EmployeeID")))
-        password_input = wait.until(EC.presence_of_element_located((By.NAME, "Password")))
+        employee_input, password_input, submit_btn = wait.until(
+            lambda d: d.execute_script(_LOGIN_FORM_JS)
+        )
 
         employee_input.clear()
         employee_input.send_keys(employee_id)
@@ -62,7 +440,6 @@ class NIAAttendanceMonitor:
 
         # Try to click the submit button, fall back to pressing Enter
         try:
-            submit_btn = driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
             submit_btn.click()
         except Exception:
             password_input.submit()
@@ -71,23 +448,74 @@ class NIAAttendanceMonitor:
         logging.info("✓ Login successful via Selenium")
 
     def _load_attendance_html(self, driver):
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.support.ui import WebDriverWait
+
         logging.debug("Navigating to attendance page...")
         driver.get(f"{self.base_url}/Attendance")
-        wait = WebDriverWait(driver, 30)
-        wait.until(EC.presence_of_element_located((By.ID, "DataTables_Table_0")))
-
-        # Wait for rows to be populated (if table loads via JS)
+        if driver.current_url.startswith(self.auth_url):
+            # Session cookie expired; the caller has to log in again
+            return None
+        # Wait for rows to be populated (if table loads via JS) and for the
+        # Ajax request behind them to finish; the poll that sees them ready
+        # also returns the table's JSON or markup, never the whole DOM
         try:
-            wait.until(lambda d: len(d.find_elements(By.CSS_SELECTOR, "#DataTables_Table_0 tbody tr")) > 0)
+            table_content = WebDriverWait(driver, 30, poll_frequency=0.2).until(
+                lambda d: d.execute_script(_READY_TABLE_CONTENT_JS)
+            )
         except TimeoutException:
+            table_content = driver.execute_script(_TABLE_CONTENT_JS)
+            if not table_content:
+                raise
             logging.warning("Attendance table loaded but contains no rows (yet). Proceeding with current content.")
+        logging.debug("Captured attendance table %s", "JSON" if isinstance(table_content, dict) else "HTML")
+        return table_content
+
+    def _reload_attendance_html(self, driver):
+        """Refresh the table in place through DataTables' Ajax reload
+
+        Returns None when the open page can't be reloaded this way, so the
+        caller falls back to a full navigation.
+        """
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        if not driver.current_url.startswith(f"{self.base_url}/Attendance"):
+            return None
+        if not driver.execute_script(_AJAX_RELOAD_JS):
+            return None
+        try:
+            WebDriverWait(driver, 15, poll_frequency=0.2).until(
+                lambda d: d.execute_script("return window.__niaReloaded === true;")
+            )
+        except TimeoutException:
+            logging.debug("DataTables reload did not finish, falling back to a full page load")
+            return None
 
-        html_content = driver.page_source
-        logging.debug("Captured attendance page HTML (%s chars)", len(html_content))
-        return html_content
+        table_content = driver.execute_script(_TABLE_CONTENT_JS)
+        logging.debug("Reloaded attendance table %s", "JSON" if isinstance(table_content, dict) else "HTML")
+        return table_content or None
     
     def get_attendance_data(self, employee_id, password, driver=None, reuse_driver=False):
-        """Use Selenium to log in and extract attendance data"""
+        """Fetch attendance over HTTP, using Selenium when that is unavailable
+
+        Returns ``(attendance_data, driver)``; the driver is the one passed
+        in (or None) when the HTTP path served the data.
+        """
+        if self.use_http:
+            # A browser that is already open stays as the fallback, so the
+            # HTTP path only gets to reuse cookies, not log in again
+            attendance_data = self._get_attendance_data_http(
+                employee_id,
+                password,
+                save_csv=not reuse_driver,
+                allow_login=driver is None
+            )
+            if attendance_data is not None:
+                return attendance_data, driver
+
+        from selenium.common.exceptions import TimeoutException, WebDriverException
+
         created_driver = driver is None
         if created_driver:
             try:
@@ -95,19 +523,46 @@ class NIAAttendanceMonitor:
             except WebDriverException as e:
                 logging.error(f"Unable to start Selenium driver: {e}")
                 return None, None
-            try:
-                self._login_with_selenium(driver, employee_id, password)
-            except Exception as e:
-                logging.error(f"Login failed during Selenium setup: {e}")
-                driver.quit()
-                return None, None
+            # With a persistent profile the saved cookie is tried first; the
+            # load below logs in only if the portal redirects to the form
+            if not self.profile_dir:
+                try:
+                    self._login_with_selenium(driver, employee_id, password)
+                except Exception as e:
+                    logging.error(f"Login failed during Selenium setup: {e}")
+                    driver.quit()
+                    return None, None
 
         try:
-            html_content = self._load_attendance_html(driver)
-            attendance_data = self.parse_attendance_html(html_content)
-
-            if attendance_data and attendance_data['records'] and not reuse_driver:
-                self.save_as_csv(attendance_data['table_headers'], attendance_data['records'])
+            # A warm driver already sits on the attendance page, so only the
+            # table's Ajax data is fetched again
+            table_content = None if created_driver else self._reload_attendance_html(driver)
+            # A warm driver keeps its session cookie, so login only happens
+            # again when the portal bounces us back to the login page
+            if table_content is None:
+                table_content = self._load_attendance_html(driver)
+            if table_content is None:
+                logging.info("Session expired, logging in again...")
+                self._login_with_selenium(driver, employee_id, password)
+                table_content = self._load_attendance_html(driver)
+            if table_content is None:
+                logging.error("Still redirected to login after re-authenticating")
+                return None, driver
+            if self.use_http:
+                # Let the next fetch go straight to the JSON endpoint with
+                # the browser's session
+                self._adopt_browser_cookies(driver, employee_id)
+            if isinstance(table_content, dict):
+                # DataTables' own Ajax response: no markup to parse
+                attendance_data = self._attendance_from_api(employee_id, table_content, save_csv=not reuse_driver)
+            elif reuse_driver:
+                attendance_data = self._parse_unless_unchanged(
+                    employee_id,
+                    table_content,
+                    lambda: self.parse_attendance_html(table_content)
+                )
+            else:
+                attendance_data = self._parse_and_save_csv(table_content, employee_id)
 
             return attendance_data, driver
         except TimeoutException as e:
@@ -123,65 +578,117 @@ class NIAAttendanceMonitor:
                 except Exception:
                     pass
     
-    def parse_attendance_html(self, html_content):
-        """Parse attendance table HTML (supports JS-rendered content)"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        table = soup.find('table', {'id': 'DataTables_Table_0'})
-        if not table:
+    def _parse_and_save_csv(self, html_content, employee_id):
+        """Parse attendance HTML while streaming each row into the CSV export"""
+        filename = self._csv_filename(employee_id)
+        # Rows go to a temporary file that only takes the export's name once
+        # the whole table has parsed, so a failed parse leaves nothing behind
+        partial = filename + '.part'
+        try:
+            csvfile = open(partial, 'w', newline='', encoding='utf-8')
+        except OSError as e:
+            logging.error(f"Error saving CSV: {e}")
+            return self.parse_attendance_html(html_content)
+
+        try:
+            with csvfile:
+                attendance_data = self.parse_attendance_html(html_content, csv_writer=csv.writer(csvfile))
+            if attendance_data and attendance_data['records']:
+                os.replace(partial, filename)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+
+        if attendance_data and attendance_data['records']:
+            logging.info("✓ Attendance data saved as %s", filename)
+            logging.debug("Total records: %s", attendance_data['records_found'])
+        else:
+            logging.warning("No data to save as CSV")
+        return attendance_data
+
+    def _write_export_csv(self, employee_id, rows):
+        """Write already-parsed rows to the per-fetch CSV export"""
+        if not rows:
+            logging.warning("No data to save as CSV")
+            return
+        filename = self._csv_filename(employee_id)
+        try:
+            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(_API_HEADERS)
+                writer.writerows(rows)
+            logging.info("✓ Attendance data saved as %s", filename)
+        except OSError as e:
+            logging.error(f"Error saving CSV: {e}")
+
+    @staticmethod
+    def _csv_filename(employee_id):
+        # Per employee, so parallel checks never write to the same export
+        return f"attendance_{employee_id}_{datetime.now().strftime('%Y%m%d_%H%M')}.csv"
+
+    def parse_attendance_html(self, html_content, csv_writer=None):
+        """Parse attendance table HTML (supports JS-rendered content)
+
+        When ``csv_writer`` is given, the header and each row are written to it
+        as soon as they are parsed, so no second pass over the rows is needed.
+        """
+        if isinstance(html_content, str):
+            html_content = html_content.encode('utf-8')
+        doc = lxml_html.document_fromstring(html_content, parser=_HTML_PARSER)
+        tables = _TABLE_XP(doc)
+        if not tables:
             logging.error("No attendance table found on page")
             return None
+        table = tables[0]
 
         # Extract table headers
-        headers = []
-        thead = table.find('thead')
-        if thead:
-            header_row = thead.find('tr')
-            if header_row:
-                headers = [th.get_text(strip=True) for th in header_row.find_all('th')]
+        headers = [th.text_content().strip() for th in _HEADERS_XP(table)]
 
         logging.debug("Found table headers: %s", headers)
+        if csv_writer is not None:
+            csv_writer.writerow(headers)
 
-        # Extract table rows
+        # Extract table rows: tbody rows and any direct <tr>; a header row
+        # made only of <th> cells has no <td> and is skipped below
         rows = []
-        table_body = table.find('tbody')
-        if table_body:
-            for row in table_body.find_all('tr'):
-                cells = row.find_all('td')
-                if not cells:
-                    continue
-                row_data = []
-                for cell in cells:
-                    if 'sorting_1' in cell.get('class', []):
-                        date_parts = [
-                            span.get_text(strip=True)
-                            for span in cell.find_all('span')
-                            if span.get_text(strip=True)
-                        ]
-                        row_data.append(' '.join(date_parts) if date_parts else cell.get_text(strip=True))
-                    else:
-                        row_data.append(cell.get_text(strip=True))
-                rows.append(row_data)
+        for row in _ROWS_XP(table):
+            # Cells are direct children, so walk them rather than run XPath
+            cells = list(row.iterchildren('td'))
+            if not cells:
+                continue
+            row_data = []
+            for cell in cells:
+                # Class names are whole tokens, so match them exactly rather
+                # than as substrings of the attribute
+                if 'sorting_1' in cell.get('class', '').split():
+                    # The date and time sit in adjacent spans; joining the
+                    # text nodes with a space keeps them apart in one walk
+                    row_data.append(' '.join(' '.join(cell.itertext()).split()))
+                else:
+                    row_data.append(cell.text_content().strip())
+            rows.append(row_data)
+            if csv_writer is not None:
+                csv_writer.writerow(row_data)
 
         logging.debug("Attendance rows parsed: %s", len(rows))
 
         generated_time = "Unknown"
-        tfoot = table.find('tfoot')
-        if tfoot:
-            tfoot_cells = tfoot.find_all('th')
-            if len(tfoot_cells) >= 2:
-                generated_time = tfoot_cells[1].get_text(strip=True)
+        tfoot_cells = _TFOOT_CELLS_XP(table)
+        if len(tfoot_cells) >= 2:
+            generated_time = tfoot_cells[1].text_content().strip()
 
         total_records = "Unknown"
-        caption = table.find('caption')
-        if caption:
-            caption_text = caption.get_text(strip=True)
-            match = re.search(r'\((\d+)\)', caption_text)
+        captions = _CAPTION_XP(table)
+        if captions:
+            caption_text = captions[0].text_content().strip()
+            match = _CAPTION_COUNT_RE.search(caption_text)
             if match:
                 total_records = match.group(1)
 
+        now = datetime.now()
         return {
-            'timestamp': datetime.now().isoformat(),
-            'date': datetime.now().strftime('%Y-%m-%d'),
+            'timestamp': now.isoformat(),
+            'date': now.strftime('%Y-%m-%d'),
             'table_headers': headers,
             'records': rows,
             'records_found': len(rows),
@@ -190,29 +697,45 @@ class NIAAttendanceMonitor:
         }
 
     def save_as_csv(self, headers, rows):
-        """Save attendance data as CSV file"""
+        """Append rows not yet exported today to the daily CSV file"""
         try:
             if not rows:
                 logging.warning("No data to save as CSV")
                 return
             
-            # Create DataFrame
-            df = pd.DataFrame(rows, columns=headers)
-            
-            # Generate filename with current date
-            filename = f"attendance_{datetime.now().strftime('%Y%m%d_%H%M')}.csv"
-            
-            # Save to CSV
-            df.to_csv(filename, index=False, encoding='utf-8')
-            logging.info("✓ Attendance data saved as %s", filename)
-            
-            logging.debug("Recent attendance records preview:")
-            print(df.head(10).to_string(index=False))
+            # One file per day; rows already in it are remembered
+            filename = f"attendance_{datetime.now().strftime('%Y%m%d')}.csv"
+            write_header = not os.path.exists(filename)
+            if filename != self._csv_day_file:
+                self._csv_day_file = filename
+                self._csv_written = set()
+                if not write_header:
+                    with open(filename, newline='', encoding='utf-8') as csvfile:
+                        existing = csv.reader(csvfile)
+                        next(existing, None)
+                        self._csv_written.update(map(self._row_key, existing))
+
+            new_rows = []
+            for row in rows:
+                row_key = self._row_key(row)
+                if row_key not in self._csv_written:
+                    self._csv_written.add(row_key)
+                    new_rows.append(row)
+
+            if not new_rows:
+                logging.debug("All %s rows already exported to %s", len(rows), filename)
+                return
+
+            with open(filename, 'a', newline='', encoding='utf-8', buffering=65536) as csvfile:
+                writer = csv.writer(csvfile)
+                if write_header:
+                    writer.writerow(headers)
+                writer.writerows(new_rows)
+            logging.info("✓ Appended %s new row(s) to %s", len(new_rows), filename)
             
-            # Show summary
-            logging.debug("Total records: %s", len(rows))
-            if 'Date Time' in df.columns:
-                logging.debug("Date range: %s to %s", df['Date Time'].min(), df['Date Time'].max())
+            logging.debug("New attendance records preview:")
+            for row in new_rows[:10]:
+                logging.debug("  %s", row)
             
         except Exception as e:
             logging.error(f"Error saving CSV: {e}")
@@ -231,12 +754,16 @@ class NIAAttendanceMonitor:
                 logging.warning(f"No records found")
                 return None
             
-            # Find column indices
-            date_time_idx = headers.index('Date Time') if 'Date Time' in headers else 1
-            emp_id_idx = headers.index('Employee ID') if 'Employee ID' in headers else 4
+            # Find column indices once, falling back to the usual layout
+            header_idx = {h.strip().lower(): i for i, h in enumerate(headers)}
+            date_time_idx = header_idx.get('date time', 1)
+            emp_id_idx = header_idx.get('employee id', 4)
+            temp_idx = header_idx.get('temperature', 2)
             
-            # Filter records for this employee
-            my_records = [record for record in records if len(record) > emp_id_idx and record[emp_id_idx] == employee_id]
+            # Filter records for this employee in one pass; the length check
+            # covers both columns used below
+            min_len = max(date_time_idx, emp_id_idx) + 1
+            my_records = [r for r in records if len(r) >= min_len and r[emp_id_idx] == employee_id]
             
             logging.debug("ATTENDANCE ANALYSIS FOR EMPLOYEE %s", employee_id)
             logging.debug("Total records found: %s", len(my_records))
@@ -245,27 +772,17 @@ class NIAAttendanceMonitor:
                 logging.warning(f"No matching records found for Employee ID: {employee_id}")
                 return None
             
-            # Parse dates and analyze patterns
-            today = datetime.now().date()
-            today_records = []
-            
-            for record in my_records:
-                if len(record) > date_time_idx:
-                    date_str = record[date_time_idx]
-                    try:
-                        # Parse date string like "11/17/2025 12:59:09 PM"
-                        record_date = datetime.strptime(date_str, '%m/%d/%Y %I:%M:%S %p').date()
-                        if record_date == today:
-                            today_records.append(record)
-                    except ValueError as e:
-                        logging.debug(f"Date parsing error for '{date_str}': {e}")
-                        # Try alternative formats
-                        try:
-                            record_date = datetime.strptime(date_str, '%m/%d/%Y %I:%M %p').date()
-                            if record_date == today:
-                                today_records.append(record)
-                        except ValueError:
-                            pass
+            # Date Time values start with the date, e.g. "11/17/2025 12:59:09 PM",
+            # so today's rows are found by prefix without parsing any times;
+            # month and day may or may not be zero-padded
+            now = datetime.now()
+            today = now.date()
+            today_prefixes = tuple({
+                f"{month}/{day}/{today.year} "
+                for month in (str(today.month), f"{today.month:02d}")
+                for day in (str(today.day), f"{today.day:02d}")
+            })
+            today_records = [r for r in my_records if _squash_ws(r[date_time_idx]).startswith(today_prefixes)]
             
             logging.info("Records for today (%s): %s", today, len(today_records))
             
@@ -273,8 +790,8 @@ class NIAAttendanceMonitor:
             if today_records:
                 logging.info("Today's attendance:")
                 for record in today_records:
-                    time_in_record = record[date_time_idx] if len(record) > date_time_idx else "N/A"
-                    temp = record[2] if len(record) > 2 else "N/A"
+                    time_in_record = record[date_time_idx]
+                    temp = record[temp_idx] if len(record) > temp_idx else "N/A"
                     logging.info(f"  - {time_in_record} (Temp: {temp}°C)")
                 
                 # Check for potential issues
@@ -292,7 +809,7 @@ class NIAAttendanceMonitor:
                 'total_records': len(my_records),
                 'today_records': len(today_records),
                 'today_details': today_records,
-                'analysis_timestamp': datetime.now().isoformat()
+                'analysis_timestamp': now.isoformat()
             }
             
         except Exception as e:
@@ -300,41 +817,58 @@ class NIAAttendanceMonitor:
             return None
     
     def save_attendance_record(self, attendance_data):
-        """Save attendance data to a local JSON file"""
+        """Append attendance data to the monthly JSON Lines backup"""
+        import orjson
+
         try:
-            filename = f"nia_attendance_backup_{datetime.now().strftime('%Y%m')}.json"
+            month = time.strftime('%Y%m')
+            filename = f"nia_attendance_backup_{month}.jsonl"
             
-            # Load existing data or create new list
-            if os.path.exists(filename):
-                with open(filename, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-            else:
-                data = []
-            
-            # Add new record
-            data.append(attendance_data)
-            
-            # Save back to file
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            # One record per line: nothing already on disk is read or rewritten
+            line = orjson.dumps(attendance_data) + b'\n'
+            with self._backup_lock:
+                if month != self._backup_month:
+                    if self._backup_file:
+                        self._backup_file.close()
+                    self._backup_file = open(filename, 'ab')
+                    self._backup_month = month
+                self._backup_file.write(line)
+                self._backup_file.flush()
             
             logging.info(f"✓ Attendance record saved to {filename}")
             
         except Exception as e:
             logging.error(f"Error saving attendance record: {e}")
     
-    def _hash_records(self, records):
-        hasher = hashlib.sha256()
-        for row in records:
-            line = "||".join(row)
-            hasher.update(line.encode('utf-8', errors='replace'))
-        return hasher.hexdigest()
+    @staticmethod
+    def _row_key(row):
+        # Rows only live in memory, so the cells themselves are a cheaper and
+        # collision-free identity than a digest of them
+        return tuple(row)
+
+    def _row_keys(self, records):
+        """Return the set of row identities for change detection"""
+        return frozenset(map(self._row_key, records))
+
+    def stop(self):
+        """Ask a running monitor_attendance loop to finish instead of waiting for the next check"""
+        self._stop.set()
 
     def monitor_attendance(self, employee_id, password, interval_seconds=300, max_checks=None):
         logging.info("Starting continuous monitoring (interval: %s seconds)", interval_seconds)
+        self._stop.clear()
+        # SIGTERM (service manager, Termux kill) ends the loop like Ctrl-C, so
+        # the exports are still drained and the browser closed
+        on_main_thread = threading.current_thread() is threading.main_thread()
+        if on_main_thread:
+            previous_sigterm = signal.signal(signal.SIGTERM, lambda signum, frame: self.stop())
         checks = 0
         driver = None
-        last_hash = None
+        last_rows = None
+        last_data = None
+        # Exports run on one worker, in order, so the next interval starts
+        # counting while they are written
+        saver = ThreadPoolExecutor(max_workers=1)
 
         try:
             attendance_data, driver = self.get_attendance_data(
@@ -344,26 +878,31 @@ class NIAAttendanceMonitor:
                 reuse_driver=True
             )
 
-            if driver is None:
-                logging.error("Failed to initialize Selenium driver. Cannot start monitoring.")
+            if attendance_data is None and driver is None:
+                logging.error("Failed to fetch attendance over HTTP or Selenium. Cannot start monitoring.")
                 return
 
             while True:
-                if attendance_data:
-                    current_hash = self._hash_records(attendance_data['records'])
-                    if last_hash is None:
-                        last_hash = current_hash
+                if attendance_data is not None and attendance_data is last_data:
+                    # Same table as last time: the parse was skipped, so
+                    # there is nothing new to compare either
+                    logging.debug("No new records since last check.")
+                elif attendance_data:
+                    current_rows = self._row_keys(attendance_data['records'])
+                    added = current_rows - last_rows if last_rows is not None else frozenset()
+                    if last_rows is None:
                         logging.info("Initial snapshot captured (%s records)", attendance_data['records_found'])
-                    elif current_hash != last_hash:
-                        logging.info("Detected change in attendance records!")
-                        last_hash = current_hash
+                    elif added:
+                        logging.info("Detected %s new attendance record(s)!", len(added))
                         if attendance_data['records']:
-                            self.save_as_csv(attendance_data['table_headers'], attendance_data['records'])
+                            saver.submit(self.save_as_csv, attendance_data['table_headers'], attendance_data['records'])
                         analysis = self.analyze_attendance_patterns(attendance_data, employee_id)
                         if analysis:
-                            self.save_attendance_record(analysis)
+                            saver.submit(self.save_attendance_record, analysis)
                     else:
-                        logging.debug("No changes detected since last check.")
+                        logging.debug("No new records since last check.")
+                    last_rows = current_rows
+                    last_data = attendance_data
                 else:
                     logging.warning("No attendance data retrieved this cycle.")
 
@@ -373,7 +912,9 @@ class NIAAttendanceMonitor:
                     break
 
                 logging.debug("Sleeping for %s seconds before next check...", interval_seconds)
-                time.sleep(interval_seconds)
+                if self._stop.wait(interval_seconds):
+                    logging.info("Stop requested. Stopping monitor.")
+                    break
 
                 attendance_data, driver = self.get_attendance_data(
                     employee_id,
@@ -384,15 +925,22 @@ class NIAAttendanceMonitor:
         except KeyboardInterrupt:
             logging.info("Monitoring interrupted by user.")
         finally:
+            if on_main_thread:
+                signal.signal(signal.SIGTERM, previous_sigterm or signal.SIG_DFL)
+            saver.shutdown(wait=True)
             if driver:
                 try:
                     driver.quit()
                 except Exception:
                     pass
     
-    def one_time_check(self, employee_id, password):
-        """Perform a single attendance check with analysis using Selenium"""
-        attendance_data, _ = self.get_attendance_data(employee_id, password)
+    def one_time_check(self, employee_id, password, driver=None):
+        """Perform a single attendance check with analysis
+
+        Pass an already logged-in ``driver`` to skip the browser cold start
+        and login; it is left open for the caller.
+        """
+        attendance_data, _ = self.get_attendance_data(employee_id, password, driver=driver)
         if attendance_data:
             analysis = self.analyze_attendance_patterns(attendance_data, employee_id)
             if analysis:
@@ -401,8 +949,41 @@ class NIAAttendanceMonitor:
             return attendance_data
         return None
 
+    def check_many(self, creds, max_concurrency=4):
+        """Run one_time_check for several (employee_id, password) pairs in parallel
+
+        Each worker uses its own HTTP session, or starts and quits its own
+        browser on fallback, so at most ``max_concurrency`` Chrome instances
+        are alive at once. Returns a
+        dict mapping each employee ID to its check result (None on failure).
+        """
+        results = {}
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            futures = {
+                executor.submit(self.one_time_check, employee_id, password): employee_id
+                for employee_id, password in creds
+            }
+            for future in as_completed(futures):
+                employee_id = futures[future]
+                try:
+                    results[employee_id] = future.result()
+                except Exception as e:
+                    logging.error(f"Check failed for {employee_id}: {e}")
+                    results[employee_id] = None
+        return results
+
+
+def load_attendance_backup(filename):
+    """Read every record from a JSON Lines backup written by save_attendance_record"""
+    import orjson
+
+    with open(filename, 'rb') as f:
+        return [orjson.loads(line) for line in f if line.strip()]
+
 
 def main():
+    import getpass
+
     parser = argparse.ArgumentParser(description="NIA Attendance Monitor")
     parser.add_argument(
         '--mode',
@@ -429,6 +1010,20 @@ def main():
         '--driver-path',
         help='Path to ChromeDriver executable (optional)'
     )
+    parser.add_argument(
+        '--browser-only',
+        action='store_true',
+        help='Skip the direct HTTP fetch and always scrape with Selenium'
+    )
+    parser.add_argument(
+        '--low-memory',
+        action='store_true',
+        help='Run Chrome as a single process to reduce memory use'
+    )
+    parser.add_argument(
+        '--profile-dir',
+        help='Chrome profile directory to keep between runs (optional)'
+    )
     parser.add_argument(
         '--verbose',
         action='store_true',
@@ -439,7 +1034,13 @@ def main():
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
 
-    monitor = NIAAttendanceMonitor(headless=not args.show_browser, driver_path=args.driver_path)
+    monitor = NIAAttendanceMonitor(
+        headless=not args.show_browser,
+        driver_path=args.driver_path,
+        use_http=not args.browser_only,
+        low_memory=args.low_memory,
+        profile_dir=args.profile_dir
+    )
     
     # Get credentials securely
     employee_id = input("Enter your Employee ID: ")